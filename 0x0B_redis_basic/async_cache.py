@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Asyncio Redis Module: the Cache of exercise.py on a redis.asyncio client
+"""
+
+import contextvars
+import random
+import redis.asyncio
+from contextlib import asynccontextmanager
+from typing import (Union, Callable, Optional, Iterable, AsyncIterator,
+                    List)
+from functools import wraps
+from exercise import (Cache, CacheLayout, HistoryPager, namespace_pattern,
+                      history_name, check_history_options, as_text,
+                      queue_store)
+
+
+@asynccontextmanager
+async def async_batch(cache) -> AsyncIterator[redis.asyncio.client.Pipeline]:
+    """
+    Queue the Redis writes made inside the block in one pipeline
+    (MULTI/EXEC), sent in a single round trip when the outermost block
+    exits. Nested blocks share the pipeline of the outermost one.
+    If the block raises, nothing is sent.
+
+    Parameters:
+        cache: The AsyncCache instance whose Redis client is used
+
+    Returns:
+        Pipeline: The pipeline to queue the commands on
+    """
+    pipe = cache._pipe.get()
+    if pipe is not None:
+        yield pipe
+        return
+    # Le pipeline est propre à la tâche, le client Redis étant partagé
+    pipe = cache._redis.pipeline()
+    token = cache._pipe.set(pipe)
+    try:
+        yield pipe
+        await pipe.execute()
+    finally:
+        cache._pipe.reset(token)
+        await pipe.reset()
+
+
+def async_count_calls(method: Optional[Callable] = None, *,
+                      name: Optional[str] = None) -> Callable:
+    """
+    Decorator that increments a Redis counter each time the coroutine
+    method is called (same layout as count_calls).
+
+    Parameters:
+        method: The coroutine method to be decorated
+        name: The name of the counter key, the qualified name of the
+            method by default. AsyncCache uses the names of Cache, so
+            both count their calls on the same keys.
+
+    Returns:
+        Callable: The wrapped coroutine method that increments a counter
+    """
+    if method is None:
+        return lambda method: async_count_calls(method, name=name)
+    if name is None:
+        name = history_name(method)
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        """
+        Increment the call count in Redis and await the original method.
+
+        Parameters:
+            self: The instance of the class
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The return value of the original method
+        """
+        key = self._key(name)
+        async with async_batch(self) as pipe:
+            # Incrémente la valeur d'une clé de 1
+            pipe.incr(key)
+            return await method(self, *args, **kwargs)
+    # Nom lu par replay
+    wrapper.history_name = name
+    return wrapper
+
+
+def async_call_history(method: Optional[Callable] = None, *,
+                       max_length: Optional[int] = None,
+                       ttl: Optional[int] = None,
+                       sample_rate: float = 1.0,
+                       name: Optional[str] = None) -> Callable:
+    """
+    Decorator that stores the history of inputs and outputs of a
+    coroutine method in Redis lists (same lists and options as
+    call_history).
+
+    Parameters:
+        method: The coroutine method to be decorated
+        name: The name of the history keys, the qualified name of the
+            method by default (see async_count_calls)
+        max_length: Keep only the last max_length calls (LTRIM)
+        ttl: Drop the history after ttl seconds without a recorded call
+        sample_rate: Fraction of the calls recorded, chosen at random
+
+    Returns:
+        Callable: The wrapped coroutine method that records its calls
+    """
+    if method is None:
+        # Décorateur avec options : on renvoie le vrai décorateur
+        return lambda method: async_call_history(
+            method, max_length=max_length, ttl=ttl, sample_rate=sample_rate,
+            name=name)
+    check_history_options(max_length, sample_rate)
+    if name is None:
+        name = history_name(method)
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        """
+        Store the method's input arguments and output in Redis.
+
+        Parameters:
+            self: The instance of the class
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The return value of the original method
+        """
+        # Appel non échantillonné : rien n'est enregistré
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return await method(self, *args, **kwargs)
+
+        inputs_key = self._key(name + ":inputs")
+        outputs_key = self._key(name + ":outputs")
+
+        async with async_batch(self) as pipe:
+            pipe.rpush(inputs_key, str(args))
+            result = await method(self, *args, **kwargs)
+            pipe.rpush(outputs_key, result)
+            # Les deux listes sont coupées ensemble et restent alignées
+            for key in (inputs_key, outputs_key):
+                if max_length is not None:
+                    pipe.ltrim(key, -max_length, -1)
+                if ttl is not None:
+                    pipe.expire(key, ttl)
+
+        return result
+    wrapper.history_name = name
+    return wrapper
+
+
+async def replay(method: Callable,
+                 redis_client: Optional[redis.asyncio.Redis] = None,
+                 page_size: int = 100,
+                 limit: Optional[int] = None,
+                 match: Union[str, Callable[[str, str], bool], None] = None,
+                 namespace: Optional[str] = None) -> None:
+    """
+    Display the history of calls for a given method stored in Redis,
+    reading it page by page (see exercise.replay).
+
+    Parameters:
+        method (Callable): The method whose call history is displayed.
+        redis_client: The asyncio Redis client to use. Defaults to the
+            client of the AsyncCache the method is bound to, else a new
+            client, closed before returning.
+        page_size: Number of calls read per round trip.
+        limit: Maximum number of calls displayed.
+        match: Only display the calls whose inputs contain this string,
+            or for which match(inputs, output) returns True.
+        namespace: The namespace of the history. Defaults to the one
+            of the AsyncCache the method is bound to, else none.
+
+    Returns:
+        None
+    """
+    owner = getattr(method, "__self__", None)
+    if namespace is None:
+        namespace = getattr(owner, "namespace", "")
+    pager = HistoryPager(method, namespace, page_size, limit, match)
+    if redis_client is None:
+        redis_client = getattr(owner, "_redis", None)
+    if redis_client is None:
+        # Client créé pour cet appel : il est fermé à la fin
+        client = redis.asyncio.Redis()
+        try:
+            await _replay(pager, client)
+        finally:
+            await client.aclose()
+    else:
+        await _replay(pager, redis_client)
+
+
+async def _replay(pager: HistoryPager,
+                  redis_client: redis.asyncio.Redis) -> None:
+    """
+    Print the call count and the pages of calls read by `pager`.
+    """
+    pager.print_count(await redis_client.get(pager.count_key))
+    page = pager.next_page()
+    while page is not None:
+        # Lecture d'une page des deux listes en un seul aller-retour
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.lrange(pager.inputs_key, *page)
+        pipe.lrange(pager.outputs_key, *page)
+        pager.print_page(*await pipe.execute())
+        page = pager.next_page()
+
+
+class AsyncCache(CacheLayout):
+    """
+    Class AsyncCache: the Cache of exercise.py for asyncio code.
+
+    The keys (values, call counters and histories) are the ones of
+    Cache, so an AsyncCache and a Cache on the same namespace read
+    each other's values, and count and record their calls together.
+    The constructor can't wait for Redis: use
+    `await AsyncCache.create(...)` to get a cleared instance.
+    """
+
+    def __init__(self, pool: Optional[redis.asyncio.ConnectionPool] = None,
+                 namespace: str = "", typed: bool = False,
+                 compression: Optional[str] = "zlib",
+                 content_addressed: bool = False):
+        """
+        Constructor of the class. The data of the namespace is kept.
+
+        Parameters:
+            pool: The asyncio connection pool to use, a new one of the
+                client by default.
+            namespace: The prefix of the keys of this instance.
+            typed: Store the values with their type (see Cache).
+            compression: The compression of the large typed values.
+            content_addressed: Key the values by a hash of their
+                content (see Cache).
+        """
+        if pool is not None:
+            self._redis = redis.asyncio.Redis(connection_pool=pool)
+        else:
+            self._redis = redis.asyncio.Redis()
+        # Pipeline en cours, par tâche (voir async_batch)
+        self._pipe = contextvars.ContextVar("pipe", default=None)
+        self._set_layout(namespace, typed, compression, content_addressed)
+
+    @classmethod
+    async def create(cls, pool: Optional[redis.asyncio.ConnectionPool] = None,
+                     namespace: str = "",
+                     reattach: bool = False,
+                     **options) -> "AsyncCache":
+        """
+        Return a new AsyncCache, cleared like a Cache unless reattach.
+
+        Parameters:
+            pool: The asyncio connection pool to use.
+            namespace: The prefix of the keys of the instance.
+            reattach: Keep the existing data of the namespace instead
+                of clearing it.
+            **options: The other options of the constructor (typed...).
+
+        Returns:
+            AsyncCache: The new instance
+        """
+        cache = cls(pool, namespace, **options)
+        if not reattach:
+            await cache.clear()
+        return cache
+
+    async def aclose(self) -> None:
+        """
+        Close the Redis client of the instance.
+        """
+        await self._redis.aclose()
+
+    async def clear(self) -> None:
+        """
+        Delete the data of the namespace (the whole DB without one).
+        """
+        if not self.namespace:
+            await self._redis.flushdb()
+            return
+        # Chaque page de SCAN est supprimée d'un coup
+        cursor = None
+        while cursor != 0:
+            cursor, keys = await self._redis.scan(
+                cursor or 0, match=namespace_pattern(self.namespace),
+                count=self.CLEAR_BATCH)
+            if keys:
+                await self._redis.unlink(*keys)
+
+    @async_count_calls(name=Cache.store.__qualname__)
+    @async_call_history(name=Cache.store.__qualname__)
+    async def store(self, data: Union[str, bytes, int, float],
+                    ttl: Optional[int] = None) -> str:
+        """
+        Store a value in Redis using a random key, or the hash of the
+        value in content-addressed mode (see Cache.store).
+
+        Parameters:
+            data: Data to store in Redis. Can be str, bytes, int or float.
+            ttl: Seconds before the key expires, None to keep it.
+
+        Returns:
+            str: The generated key used to store the data.
+        """
+        value = self._encode(data)
+        key = self._new_key(value)
+        async with async_batch(self) as pipe:
+            queue_store(pipe, self._key(key), value, ttl,
+                        self.content_addressed)
+        return key
+
+    async def store_many(self, data: Iterable[Union[str, bytes, int, float]],
+                         ttl: Optional[int] = None) -> List[str]:
+        """
+        Store several values in a single Redis round trip.
+
+        Parameters:
+            data: The values to store. Each can be str, bytes, int or float.
+            ttl: Seconds before the keys expire, None to keep them.
+
+        Returns:
+            List[str]: The generated keys, in the order of the values.
+        """
+        async with async_batch(self):
+            return [await self.store(value, ttl=ttl) for value in data]
+
+    async def get(self, key: str, fn: Optional[Callable] = None) -> Union[
+            str, bytes, int, float, None]:
+        """
+        Retrieve a value from Redis by key.
+        Optionally apply a conversion function `fn` to the result.
+        Returns None if key does not exist.
+        """
+        return self._convert(await self._redis.get(self._key(key)), fn)
+
+    async def get_many(self, keys: Iterable[str],
+                       fn: Optional[Callable] = None) -> List[
+            Union[str, bytes, int, float, None]]:
+        """
+        Retrieve several values from Redis in a single round trip (MGET).
+        Optionally apply a conversion function `fn` to each value found.
+
+        Parameters:
+            keys: The keys to read.
+            fn: The conversion applied to each value found.
+
+        Returns:
+            list: The values, in the order of the keys, with None for
+            the keys that don't exist.
+        """
+        keys = self._keys(keys)
+        if not keys:
+            return []
+        return [self._convert(data, fn)
+                for data in await self._redis.mget(keys)]
+
+    async def get_int(self, key: str) -> Optional[int]:
+        """
+        Retrieve a value from Redis and convert it to int.
+        Returns None if key does not exist.
+        """
+        return await self.get(key, int)
+
+    async def get_str(self, key: str) -> Optional[str]:
+        """
+        Retrieve a value from Redis and convert it to UTF-8 string.
+        Returns None if key does not exist.
+        """
+        return await self.get(key, as_text)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Round-trip benchmarks for the Redis Cache class.
+A Redis server must be running on localhost.
+
+Usage: ./benchmark.py
+"""
+import time
+from exercise import Cache
+
+
+def per_item(function, count):
+    """
+    Return the time per item (in microseconds) of function().
+    """
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_reads(cache, batch=50, rounds=200):
+    """
+    Print the time per key of a loop of get versus get_many.
+    """
+    keys = cache.store_many(range(batch))
+
+    def looped():
+        for _ in range(rounds):
+            [cache.get(key, int) for key in keys]
+
+    def batched():
+        for _ in range(rounds):
+            cache.get_many(keys, int)
+
+    print("Reads, {} keys per page".format(batch))
+    print("  get loop: {:7.1f} us/key".format(
+        per_item(looped, batch * rounds)))
+    print("  get_many: {:7.1f} us/key".format(
+        per_item(batched, batch * rounds)))
+
+
+def bench_writes(cache, batch=50, rounds=200):
+    """
+    Print the time per value of a loop of store versus store_many.
+    """
+    def looped():
+        for _ in range(rounds):
+            [cache.store(value) for value in range(batch)]
+
+    def batched():
+        for _ in range(rounds):
+            cache.store_many(range(batch))
+
+    print("Writes, {} values per batch".format(batch))
+    print("  store loop: {:7.1f} us/value".format(
+        per_item(looped, batch * rounds)))
+    print("  store_many: {:7.1f} us/value".format(
+        per_item(batched, batch * rounds)))
+
+
+def bench_encoding():
+    """
+    Print the bytes stored in Redis for a few values, as text and with
+    the typed encoding.
+    """
+    plain = Cache(namespace="benchmark:plain")
+    typed = Cache(namespace="benchmark:typed", typed=True)
+    values = [("int", 1234567890), ("float", 3.141592653589793),
+              ("short str", "hello"), ("json 4 kB", '{"id": 1}, ' * 400)]
+    print("Stored bytes, text versus typed")
+    for name, value in values:
+        sizes = [cache._redis.strlen(cache._key(cache.store(value)))
+                 for cache in (plain, typed)]
+        print("  {:>9}: {:5d} B  {:5d} B".format(name, *sizes))
+    plain.clear()
+    typed.clear()
+
+
+if __name__ == "__main__":
+    cache = Cache(namespace="benchmark")
+    bench_reads(cache)
+    bench_writes(cache)
+    bench_encoding()
+    cache.clear()
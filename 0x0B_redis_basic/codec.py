@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Typed value encoding for the Redis Cache: one header byte (type and
+compression) followed by a compact binary payload
+"""
+
+import struct
+import zlib
+from typing import Union, Optional
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Type de la valeur : 4 bits de poids faible de l'en-tête
+STR = 1
+BYTES = 2
+INT = 3
+FLOAT = 4
+# Compression du payload : 4 bits de poids fort de l'en-tête
+RAW = 0
+ZLIB = 1
+LZ4 = 2
+
+# Taille à partir de laquelle un payload est compressé
+COMPRESS_THRESHOLD = 1024
+
+_TYPES = {str: STR, bytes: BYTES, int: INT, float: FLOAT}
+_FLOAT = struct.Struct(">d")
+
+
+def _compressors() -> dict:
+    """
+    Return the available compressions, by name.
+    """
+    compressors = {"zlib": (ZLIB, zlib.compress)}
+    if lz4 is not None:
+        compressors["lz4"] = (LZ4, lz4.frame.compress)
+    return compressors
+
+
+def check_compression(compression: Optional[str]) -> None:
+    """
+    Raise a ValueError when `compression` isn't available: unknown
+    name, or "lz4" without the lz4 package.
+    """
+    if compression is not None and compression not in _compressors():
+        if compression == "lz4":
+            raise ValueError("the lz4 package is needed for lz4 compression")
+        raise ValueError(f"unknown compression: {compression}")
+
+
+def encode(data: Union[str, bytes, int, float],
+           compression: Optional[str] = "zlib",
+           threshold: int = COMPRESS_THRESHOLD) -> bytes:
+    """
+    Encode a value with its type, compressing large payloads.
+
+    Parameters:
+        data: The value to encode. Can be str, bytes, int or float.
+        compression: "zlib", "lz4" (needs the lz4 package) or None.
+        threshold: Payloads of at least this many bytes are compressed,
+            when it makes them smaller.
+
+    Returns:
+        bytes: The header byte followed by the payload.
+    """
+    kind = _TYPES.get(type(data))
+    if kind is None:
+        raise TypeError(f"cannot encode a value of type "
+                        f"{type(data).__name__}")
+    if kind == STR:
+        payload = data.encode("utf-8")
+    elif kind == INT:
+        # Entier signé sur le nombre minimal d'octets
+        payload = data.to_bytes((data + (data < 0)).bit_length() // 8 + 1,
+                                "big", signed=True)
+    elif kind == FLOAT:
+        payload = _FLOAT.pack(data)
+    else:
+        payload = data
+    check_compression(compression)
+    codec = RAW
+    if compression is not None and len(payload) >= threshold:
+        codec, compress = _compressors()[compression]
+        packed = compress(payload)
+        if len(packed) < len(payload):
+            payload = packed
+        else:
+            codec = RAW
+    return bytes([codec << 4 | kind]) + payload
+
+
+def decode(data: bytes) -> Union[str, bytes, int, float]:
+    """
+    Decode a value written by encode.
+
+    Parameters:
+        data: The bytes read from Redis.
+
+    Returns:
+        The value, with the type it was stored with.
+    """
+    codec, kind = data[0] >> 4, data[0] & 0x0F
+    payload = data[1:]
+    if codec == ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec == LZ4:
+        if lz4 is None:
+            raise ValueError("the lz4 package is needed to decode this value")
+        payload = lz4.frame.decompress(payload)
+    elif codec != RAW:
+        raise ValueError(f"unknown compression: {codec}")
+    if kind == STR:
+        return payload.decode("utf-8")
+    if kind == INT:
+        return int.from_bytes(payload, "big", signed=True)
+    if kind == FLOAT:
+        return _FLOAT.unpack(payload)[0]
+    if kind == BYTES:
+        return payload
+    raise ValueError(f"unknown value type: {kind}")
@@ -3,16 +3,433 @@
 Basic Redis Module
 """
 
+import atexit
+import hashlib
+import random
 import redis
+import threading
+import time
 import uuid
-from typing import Union, Callable, Optional
+from contextlib import contextmanager
+from typing import Union, Callable, Optional, Iterable, Iterator, List
 from functools import wraps
+from codec import encode, decode, check_compression
+
+
+class InstrumentedPool(redis.BlockingConnectionPool):
+    """
+    Blocking connection pool that counts its checkouts, and how many of
+    them had to wait for a free connection (and for how long).
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        Create the pool, see redis.BlockingConnectionPool.
+        """
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def get_connection(self, *args, **kwargs):
+        """
+        Check a connection out of the pool, recording the wait.
+        """
+        # Pool vide : il faudra attendre qu'une connexion soit rendue
+        empty = self.pool.empty()
+        start = time.perf_counter()
+        connection = super().get_connection(*args, **kwargs)
+        waited = time.perf_counter() - start
+        with self._metrics_lock:
+            self.checkouts += 1
+            if empty:
+                self.waits += 1
+                self.wait_time += waited
+        return connection
+
+    def metrics(self) -> dict:
+        """
+        Return the checkout counters and the pool usage.
+        """
+        with self._metrics_lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "max_connections": self.max_connections,
+                "in_use": len(self._connections) - self.pool.qsize() +
+                self.pool.queue.count(None),
+            }
+
+
+# Pool partagé par toutes les instances de Cache et par replay
+_pool: Optional[InstrumentedPool] = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(max_connections: int = 50,
+                   timeout: Optional[float] = 20,
+                   socket_timeout: Optional[float] = None,
+                   socket_connect_timeout: Optional[float] = None,
+                   socket_keepalive: bool = True,
+                   **connection_kwargs) -> InstrumentedPool:
+    """
+    Replace the connection pool shared by the Cache instances.
+
+    Parameters:
+        max_connections: Maximum number of open connections
+        timeout: Seconds to wait for a free connection (None: forever)
+        socket_timeout: Seconds to wait for a Redis reply
+        socket_connect_timeout: Seconds to wait for a connection
+        socket_keepalive: Enable TCP keepalive on the connections
+        **connection_kwargs: Other connection settings (host, port, db...)
+
+    Returns:
+        InstrumentedPool: The new shared pool
+    """
+    global _pool
+    pool = InstrumentedPool(max_connections=max_connections,
+                            timeout=timeout,
+                            socket_timeout=socket_timeout,
+                            socket_connect_timeout=socket_connect_timeout,
+                            socket_keepalive=socket_keepalive,
+                            **connection_kwargs)
+    with _pool_lock:
+        previous, _pool = _pool, pool
+    if previous is not None:
+        previous.disconnect()
+    return pool
+
+
+def get_pool() -> InstrumentedPool:
+    """
+    Return the shared connection pool, created with the default
+    settings on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InstrumentedPool(socket_keepalive=True)
+        return _pool
+
+
+def namespaced(namespace: str, name: str) -> str:
+    """
+    Return the Redis key of `name` in a namespace ("" for none).
+
+    Parameters:
+        namespace: The namespace of a Cache instance
+        name: The key without namespace
+
+    Returns:
+        str: "namespace:name", or name without namespace
+    """
+    return f"{namespace}:{name}" if namespace else name
+
+
+def as_text(data: Union[str, bytes, int, float]) -> str:
+    """
+    Convert a value read from a Cache to str, bytes being UTF-8.
+    """
+    if isinstance(data, bytes):
+        return data.decode("utf-8")
+    return str(data)
+
+
+def new_key(value: Union[str, bytes, int, float],
+            encoder=None) -> str:
+    """
+    Return the key of a value to store: a random one, or the hash of
+    the value when an encoder is given (content-addressed mode).
+
+    Parameters:
+        value: The value written to Redis
+        encoder: The encoder of the Redis client, giving the bytes
+            Redis stores for the value
+
+    Returns:
+        str: A uuid4, or the BLAKE2b hash of the stored bytes
+    """
+    if encoder is None:
+        # génération d'une key random
+        return str(uuid.uuid4())
+    return hashlib.blake2b(encoder.encode(value), digest_size=16).hexdigest()
+
+
+def queue_store(pipe, key: str, value: Union[str, bytes, int, float],
+                ttl: Optional[int] = None,
+                content_addressed: bool = False) -> None:
+    """
+    Queue on a pipeline the commands writing a value, see Cache.store.
+
+    Parameters:
+        pipe: The pipeline (sync or asyncio)
+        key: The Redis key of the value
+        value: The value written to Redis
+        ttl: Seconds before the key expires, None to keep it
+        content_addressed: The key is the hash of the value
+
+    Returns:
+        None
+    """
+    if ttl is not None and ttl < 1:
+        raise ValueError("ttl must be a positive integer")
+    if not content_addressed:
+        pipe.set(key, value, ex=ttl)
+        return
+    # Valeur déjà présente : SET NX ne réécrit rien
+    pipe.set(key, value, ex=ttl, nx=True)
+    # La clé doit vivre au moins aussi longtemps que ce store le demande
+    if ttl is None:
+        pipe.persist(key)
+    else:
+        pipe.expire(key, ttl, gt=True)
+
+
+def namespace_pattern(namespace: str) -> str:
+    """
+    Return the SCAN pattern matching every key of a namespace.
+
+    Parameters:
+        namespace: The namespace of a Cache instance (not empty)
+
+    Returns:
+        str: The pattern, special characters of the namespace escaped
+    """
+    # Échappe les caractères spéciaux du motif de SCAN
+    return "".join("\\" + char if char in "*?[]\\" else char
+                   for char in namespace) + ":*"
+
+
+def history_name(method: Callable) -> str:
+    """
+    Return the name of the counter and history keys of a method: its
+    qualified name, unless a decorator gave it another one.
+    """
+    return getattr(method, "history_name", method.__qualname__)
+
+
+def history_filter(match: Union[str, Callable[[str, str], bool], None]
+                   ) -> Optional[Callable[[str, str], bool]]:
+    """
+    Return the filter of replay: a needle searched in the inputs
+    becomes a function of (inputs, output), a function is kept.
+    """
+    if not isinstance(match, str):
+        return match
+    needle = match
+
+    def contains(inputs: str, output: str) -> bool:
+        """
+        Tell whether the inputs of a call contain the needle.
+        """
+        return needle in inputs
+    return contains
+
+
+class HistoryPager:
+    """
+    The Redis-independent part of replay: the keys of a call history,
+    the pages to read and the printing of the calls, shared by the
+    sync and asyncio replay functions.
+    """
+    def __init__(self, method: Callable, namespace: str,
+                 page_size: int = 100, limit: Optional[int] = None,
+                 match: Union[str, Callable[[str, str], bool],
+                              None] = None):
+        """
+        Constructor of the class, see replay for the parameters.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be a positive integer")
+        self.method_name = history_name(method)
+        self.count_key = namespaced(namespace, self.method_name)
+        self.inputs_key = namespaced(namespace,
+                                     self.method_name + ":inputs")
+        self.outputs_key = namespaced(namespace,
+                                      self.method_name + ":outputs")
+        self.page_size = page_size
+        self.limit = limit
+        self.match = history_filter(match)
+        self.shown = 0
+        # Début de la prochaine page, None quand tout est lu
+        self.start = 0
+
+    def print_count(self, count: Optional[bytes]) -> None:
+        """
+        Print how many times the method was called.
+        """
+        count = int(count) if count is not None else 0
+        print(f"{self.method_name} was called {count} times:")
+
+    def next_page(self) -> Optional[tuple]:
+        """
+        Return the (start, end) indexes of the next page to read in
+        both lists, or None when the replay is over.
+        """
+        if self.start is None or \
+                (self.limit is not None and self.shown >= self.limit):
+            return None
+        return self.start, self.start + self.page_size - 1
+
+    def print_page(self, inputs: List[bytes], outputs: List[bytes]) -> None:
+        """
+        Print the calls of a page that pass the filter, up to the limit.
+        """
+        # Association des inputs et outputs et affichage de ceux-ci
+        for input, output in zip(inputs, outputs):
+            input = input.decode('utf-8')
+            output = output.decode('utf-8')
+            if self.match is not None and not self.match(input, output):
+                continue
+            print(f"{self.method_name}(*{input}) ->{output}")
+            self.shown += 1
+            if self.limit is not None and self.shown >= self.limit:
+                break
+        if len(inputs) < self.page_size:
+            self.start = None
+        else:
+            self.start += self.page_size
+
+
+@contextmanager
+def batch(cache) -> Iterator[redis.client.Pipeline]:
+    """
+    Queue the Redis writes made inside the block in one pipeline
+    (MULTI/EXEC), sent in a single round trip when the outermost block
+    exits. Nested blocks share the pipeline of the outermost one.
+    If the block raises, nothing is sent.
+
+    Parameters:
+        cache: The Cache instance whose Redis client is used
+
+    Returns:
+        Pipeline: The pipeline to queue the commands on
+    """
+    pipe = getattr(cache._local, "pipe", None)
+    if pipe is not None:
+        yield pipe
+        return
+    # Le pipeline est propre au thread, le client Redis étant partagé
+    pipe = cache._local.pipe = cache._redis.pipeline()
+    try:
+        yield pipe
+        pipe.execute()
+    finally:
+        cache._local.pipe = None
+        pipe.reset()
+
+
+class CounterBuffer:
+    """
+    In-process call counters, flushed to Redis in one INCRBY per key
+    every `interval` seconds, as soon as `threshold` calls are pending,
+    and when the interpreter exits.
+
+    The counters read from Redis lag behind by at most one interval.
+    Counts whose flush fails are kept for the next one. Once the buffer
+    is closed, each call is sent to Redis right away.
+    """
+    def __init__(self, interval: float = 1.0, threshold: int = 1000):
+        """
+        Constructor of the class.
+
+        Parameters:
+            interval: Maximum seconds between two flushes
+            threshold: Number of pending calls that triggers a flush
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if threshold < 1:
+            raise ValueError("threshold must be a positive integer")
+        self.interval = interval
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # {client Redis: {clé: incrément}}
+        self._counts = {}
+        self._pending = 0
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def add(self, client: redis.Redis, key: str, amount: int = 1) -> None:
+        """
+        Count `amount` calls on `key`, to be flushed with `client`.
+        """
+        with self._lock:
+            stopped = self._stopped
+            if not stopped:
+                counts = self._counts.setdefault(client, {})
+                counts[key] = counts.get(key, 0) + amount
+                self._pending += amount
+                if self._thread is None:
+                    self._start()
+                if self._pending >= self.threshold:
+                    # Le flush se fait hors du chemin de l'appelant
+                    self._wake.set()
+        if stopped:
+            # Plus de flush après close : l'appel est compté tout de suite
+            client.incrby(key, amount)
+
+    def _start(self) -> None:
+        """
+        Start the flushing thread (the lock is held).
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        """
+        Flush the counters until the buffer is closed.
+        """
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Send the pending counts, one pipeline per Redis client.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._pending = 0
+        for client, keys in counts.items():
+            pipe = client.pipeline(transaction=False)
+            for key, amount in keys.items():
+                pipe.incrby(key, amount)
+            try:
+                pipe.execute()
+            except redis.RedisError:
+                # Remis en attente pour le prochain flush, sans le
+                # déclencher tout de suite
+                with self._lock:
+                    pending = self._counts.setdefault(client, {})
+                    for key, amount in keys.items():
+                        pending[key] = pending.get(key, 0) + amount
+                        self._pending += amount
+
+    def close(self) -> None:
+        """
+        Stop the flushing thread and send the pending counts.
+        """
+        with self._lock:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+            atexit.unregister(self.close)
+        self.flush()
 
 
 # Count_calls declarator
 def count_calls(method: Callable) -> Callable:
     """
     Decorator that increments a Redis counter each time the method is called.
+    When the instance has a CounterBuffer in `_counters`, the call is
+    counted in process and the counter is incremented at its next flush.
 
     Parameters:
         method: The method to be decorated
@@ -33,26 +450,58 @@ def count_calls(method: Callable) -> Callable:
         Returns:
             The return value of the original method
         """
-        key = method.__qualname__
-        # Incrémente la valeur d'une clé de 1
-        self._redis.incr(key)
-        # Exécution de la méthode.
-        return method(self, *args, **kwargs)
+        key = self._key(method.__qualname__)
+        counters = getattr(self, "_counters", None)
+        if counters is not None:
+            counters.add(self._redis, key)
+            return method(self, *args, **kwargs)
+        with batch(self) as pipe:
+            # Incrémente la valeur d'une clé de 1
+            pipe.incr(key)
+            # Exécution de la méthode.
+            return method(self, *args, **kwargs)
     return wrapper
 
 
+def check_history_options(max_length: Optional[int],
+                          sample_rate: float) -> None:
+    """
+    Raise a ValueError when the options of call_history are invalid.
+    """
+    if max_length is not None and max_length < 1:
+        raise ValueError("max_length must be a positive integer")
+    if not 0 <= sample_rate <= 1:
+        raise ValueError("sample_rate must be between 0 and 1")
+
+
 # Fonction call_history
-def call_history(method: Callable) -> Callable:
+def call_history(method: Optional[Callable] = None, *,
+                 max_length: Optional[int] = None,
+                 ttl: Optional[int] = None,
+                 sample_rate: float = 1.0) -> Callable:
     """
     Decorator that stores the history of inputs and outputs
     for a method in Redis lists.
 
+    Used bare (@call_history) it records every call forever. Called
+    with options (@call_history(max_length=1000, ttl=3600,
+    sample_rate=0.1)) it bounds the cost of the history.
+
     Parameters:
         method: The method to be decorated
+        max_length: Keep only the last max_length calls (LTRIM)
+        ttl: Drop the history after ttl seconds without a recorded call
+        sample_rate: Fraction of the calls recorded, chosen at random
 
     Returns:
-        Callable: The wrapped method that increments a counter
+        Callable: The wrapped method that records its calls
     """
+    if method is None:
+        # Décorateur avec options : on renvoie le vrai décorateur
+        return lambda method: call_history(
+            method, max_length=max_length, ttl=ttl, sample_rate=sample_rate)
+    check_history_options(max_length, sample_rate)
+
     @wraps(method)
     def wrapper(self, *args, **kwargs):
         """
@@ -66,107 +515,284 @@ def call_history(method: Callable) -> Callable:
         Returns:
             The return value of the original method
         """
-        # Création des clés inputs et outputs
-        inputs_key = method.__qualname__ + ":inputs"
-        outputs_key = method.__qualname__ + ":outputs"
+        # Appel non échantillonné : rien n'est enregistré
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return method(self, *args, **kwargs)
 
-        # Ajout des arguments de la fonction dans inputs_key
-        self._redis.rpush(inputs_key, str(args))
-        result = method(self, *args, **kwargs)
-        # Ajout du résultat de la fonction dans outputs_key
-        self._redis.rpush(outputs_key, result)
+        # Création des clés inputs et outputs
+        inputs_key = self._key(method.__qualname__ + ":inputs")
+        outputs_key = self._key(method.__qualname__ + ":outputs")
+
+        with batch(self) as pipe:
+            # Ajout des arguments de la fonction dans inputs_key
+            pipe.rpush(inputs_key, str(args))
+            result = method(self, *args, **kwargs)
+            # Ajout du résultat de la fonction dans outputs_key
+            pipe.rpush(outputs_key, result)
+            # Les deux listes sont coupées ensemble et restent alignées
+            for key in (inputs_key, outputs_key):
+                if max_length is not None:
+                    pipe.ltrim(key, -max_length, -1)
+                if ttl is not None:
+                    pipe.expire(key, ttl)
 
         return result
     return wrapper
 
 
-def replay(method: Callable) -> None:
+def replay(method: Callable,
+           redis_client: Optional[redis.Redis] = None,
+           page_size: int = 100,
+           limit: Optional[int] = None,
+           match: Union[str, Callable[[str, str], bool], None] = None,
+           namespace: Optional[str] = None) -> None:
     """
     Display the history of calls for a given method stored in Redis.
 
     Shows how many times the method was called and lists the
-    inputs and outputs of each call.
+    inputs and outputs of each call. The history is read page by page,
+    so memory use doesn't depend on its length.
 
     Parameters:
         method (Callable): The method whose call history is displayed.
+        redis_client: The Redis client to use. Defaults to the client
+            of the Cache the method is bound to, else a new client.
+        page_size: Number of calls read per round trip.
+        limit: Maximum number of calls displayed.
+        match: Only display the calls whose inputs contain this string,
+            or for which match(inputs, output) returns True.
+        namespace: The namespace of the history. Defaults to the one
+            of the Cache the method is bound to, else none.
 
     Returns:
         None
     """
-    # Création d'une instance Redis pour l'utiliser plus tard
-    redis_client = redis.Redis()
+    # Réutilisation du client de l'instance si la méthode est liée
+    owner = getattr(method, "__self__", None)
+    if namespace is None:
+        namespace = getattr(owner, "namespace", "")
+    pager = HistoryPager(method, namespace, page_size, limit, match)
+    if redis_client is None:
+        redis_client = getattr(owner, "_redis", None) or \
+            redis.Redis(connection_pool=get_pool())
+
+    # Récupération du nombre d'appel de la méthode
+    pager.print_count(redis_client.get(pager.count_key))
+    page = pager.next_page()
+    while page is not None:
+        # Lecture d'une page des deux listes en un seul aller-retour
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.lrange(pager.inputs_key, *page)
+        pipe.lrange(pager.outputs_key, *page)
+        pager.print_page(*pipe.execute())
+        page = pager.next_page()
+
+
+class CacheLayout:
+    """
+    The Redis-independent part of Cache, shared with AsyncCache: the
+    keys of the namespace and the encoding of the values.
+    """
+    # Taille des lots de SCAN/UNLINK pour vider un namespace
+    CLEAR_BATCH = 500
+
+    def _set_layout(self, namespace: str, typed: bool,
+                    compression: Optional[str],
+                    content_addressed: bool) -> None:
+        """
+        Set the key and value options of the instance, see Cache.
+        """
+        if typed:
+            check_compression(compression)
+        self.namespace = namespace
+        self.typed = typed
+        self.compression = compression
+        self.content_addressed = content_addressed
+
+    def _key(self, name: str) -> str:
+        """
+        Return the Redis key of `name` in the namespace of the instance.
+        """
+        return namespaced(self.namespace, name)
 
-    # Récupération de la clé de la méthode
-    method_name = method.__qualname__
+    def _keys(self, names: Iterable[str]) -> List[str]:
+        """
+        Return the Redis keys of several names.
+        """
+        return [self._key(name) for name in names]
 
-    # Récupération du nombre d'appel de la méthode et conversion en int
-    count = redis_client.get(method_name)
-    if count is not None:
-        count = int(count)
-    else:
-        count = 0
-    print(f"{method_name} was called {count} times:")
+    def _encode(self, data: Union[str, bytes, int, float]) -> Union[
+            str, bytes, int, float]:
+        """
+        Return the value written to Redis for `data`.
+        """
+        if self.typed:
+            return encode(data, self.compression)
+        return data
 
-    # Création des clés inputs et outputs
-    inputs_key = method_name + ":inputs"
-    outputs_key = method_name + ":outputs"
+    def _decode(self, data: Optional[bytes]) -> Union[
+            str, bytes, int, float, None]:
+        """
+        Return the value read from Redis as `data`.
+        """
+        if self.typed and data is not None:
+            return decode(data)
+        return data
+
+    def _convert(self, data: Optional[bytes],
+                 fn: Optional[Callable] = None) -> Union[
+            str, bytes, int, float, None]:
+        """
+        Return the value read from Redis as `data`, decoded and then
+        converted by `fn` if given (None stays None).
+        """
+        data = self._decode(data)
+        if data is None or fn is None:
+            return data
+        return fn(data)
 
-    # Récupération des listes inputs & outputs
-    inputs = redis_client.lrange(inputs_key, 0, -1)
-    outputs = redis_client.lrange(outputs_key, 0, -1)
-    # Association des inputs et outputs et affichage de ceux-ci
-    for input, output in zip(inputs, outputs):
-        print(f"{method_name}(*{input.decode('utf-8')}) ->"
-              f"{output.decode('utf-8')}")
+    def _new_key(self, value: Union[str, bytes, int, float]) -> str:
+        """
+        Return the key (without namespace) of a value to store.
+        """
+        return new_key(value, self._redis.get_encoder()
+                       if self.content_addressed else None)
 
 
-class Cache:
+class Cache(CacheLayout):
     """
     Class Cache for the DB
+
+    Each instance can live in its own namespace: its keys (values,
+    call counters and histories) are then prefixed by "namespace:",
+    so several workers can share one Redis without touching each
+    other's data.
     """
+
     # Constructeur
-    def __init__(self):
+    def __init__(self, pool: Optional[redis.ConnectionPool] = None,
+                 namespace: str = "", reattach: bool = False,
+                 counters: Optional[CounterBuffer] = None,
+                 typed: bool = False,
+                 compression: Optional[str] = "zlib",
+                 content_addressed: bool = False):
         """
         Constructor of the class.
         It initialize a Redis client before flushing it.
+
+        Parameters:
+            pool: The connection pool to use, the shared one by default
+                (see configure_pool).
+            namespace: The prefix of the keys of this instance. Without
+                namespace, clearing the cache flushes the whole DB.
+            reattach: Keep the existing data of the namespace instead
+                of clearing it.
+            counters: Buffer the call counters in process and flush
+                them periodically, instead of one INCR per call.
+            typed: Store the values with their type (see codec.encode),
+                so get returns them as stored without conversion.
+            compression: The compression of the large typed values,
+                "zlib", "lz4" or None.
+            content_addressed: Key the values by a hash of their
+                content, so storing a value already there writes
+                nothing.
         """
         # Initialisation du client Redis
-        self._redis = redis.Redis()
-        # Vide la DB
-        self._redis.flushdb()
+        self._redis = redis.Redis(
+            connection_pool=pool if pool is not None else get_pool())
+        # Pipeline en cours, par thread (voir batch)
+        self._local = threading.local()
+        self._set_layout(namespace, typed, compression, content_addressed)
+        self._counters = counters
+        if not reattach:
+            self.clear()
+
+    def clear(self) -> None:
+        """
+        Delete the data of the namespace (the whole DB without one).
+        """
+        if not self.namespace:
+            # Vide la DB
+            self._redis.flushdb()
+            return
+        # Chaque page de SCAN est supprimée d'un coup
+        cursor = None
+        while cursor != 0:
+            cursor, keys = self._redis.scan(
+                cursor or 0, match=namespace_pattern(self.namespace),
+                count=self.CLEAR_BATCH)
+            if keys:
+                self._redis.unlink(*keys)
 
     # Méthode store
     @count_calls
     @call_history
-    def store(self, data: Union[str, bytes, int, float]) -> str:
+    def store(self, data: Union[str, bytes, int, float],
+              ttl: Optional[int] = None) -> str:
         """
-        Store a value in Redis using a random key.
+        Store a value in Redis using a random key, or the hash of the
+        value in content-addressed mode (a value already stored keeps
+        its key, and is not written again).
 
         Parameters:
             data: Data to store in Redis. Can be str, bytes, int or float.
+            ttl: Seconds before the key expires, None to keep it.
 
         Returns:
             str: The generated key used to store the data.
         """
-        # génération d'une key random
-        key = str(uuid.uuid4())
-        self._redis.set(key, data)
+        value = self._encode(data)
+        key = self._new_key(value)
+        with batch(self) as pipe:
+            queue_store(pipe, self._key(key), value, ttl,
+                        self.content_addressed)
         return key
 
+    def store_many(self, data: Iterable[Union[str, bytes, int, float]],
+                   ttl: Optional[int] = None) -> List[str]:
+        """
+        Store several values in a single Redis round trip.
+
+        Parameters:
+            data: The values to store. Each can be str, bytes, int or float.
+            ttl: Seconds before the keys expire, None to keep them.
+
+        Returns:
+            List[str]: The generated keys, in the order of the values.
+        """
+        with batch(self):
+            return [self.store(value, ttl=ttl) for value in data]
+
     # Getter
     def get(self, key: str, fn: Optional[Callable] = None) -> Union[
             str, bytes, int, float, None]:
         """
-        Retrieve a value from Redis by key.
-        Optionally apply a conversion function `fn` to the result.
+        Retrieve a value from Redis by key (with its type for a typed
+        Cache). Optionally apply a conversion function `fn` to the result.
         Returns None if key does not exist.
         """
-        data = self._redis.get(key)
-        if data is None:
-            return None
-        if fn is not None:
-            return fn(data)
-        return data
+        return self._convert(self._redis.get(self._key(key)), fn)
+
+    # Lecture groupée
+    def get_many(self, keys: Iterable[str],
+                 fn: Optional[Callable] = None) -> List[
+            Union[str, bytes, int, float, None]]:
+        """
+        Retrieve several values from Redis in a single round trip (MGET).
+        Optionally apply a conversion function `fn` to each value found.
+
+        Parameters:
+            keys: The keys to read.
+            fn: The conversion applied to each value found.
+
+        Returns:
+            list: The values, in the order of the keys, with None for
+            the keys that don't exist.
+        """
+        keys = self._keys(keys)
+        if not keys:
+            return []
+        return [self._convert(data, fn) for data in self._redis.mget(keys)]
 
     # Méthode get_int
     def get_int(self, key: str) -> Optional[int]:
@@ -182,4 +808,4 @@ class Cache:
         Retrieve a value from Redis and convert it to UTF-8 string.
         Returns None if key does not exist.
         """
-        return self.get(key, lambda d: d.decode("utf-8"))
+        return self.get(key, as_text)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Two-tier cache module: an in-process caching policy (L1) in front
+of the Redis Cache (L2)
+"""
+
+from typing import Union, Callable, Optional, Tuple
+from exercise import Cache, as_text
+
+WRITE_THROUGH = "through"
+WRITE_AROUND = "around"
+INVALIDATION_CHANNEL = "cache:invalidate"
+# Évènements keyspace qui rendent une copie L1 obsolète
+INVALIDATING_EVENTS = {"del", "expired", "evicted", "unlink", "rename_from",
+                       "rename_to", "set"}
+
+
+def as_stored(data: Union[str, bytes, int, float]) -> bytes:
+    """
+    Convert a value the way Redis stores it, so that L1 holds the
+    same bytes an L2 read would return.
+
+    Parameters:
+        data: The value given to store.
+
+    Returns:
+        bytes: The value as read back from Redis.
+    """
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return repr(data).encode("utf-8")
+
+
+class TieredCache:
+    """
+    Class TieredCache: values are read from the L1 policy cache first,
+    then from Redis, and promoted to L1 on an L2 hit.
+
+    L1 can be any cache of the caching project (LRUCache...). When
+    `listen` is True, a background thread drops L1 entries deleted,
+    overwritten, renamed over, expired or invalidated in Redis by any
+    process, so L1 must then be thread-safe (SynchronizedCache or
+    StripedCache).
+    """
+    def __init__(self, l1, l2: Optional[Cache] = None,
+                 write_policy: str = WRITE_THROUGH,
+                 listen: bool = False,
+                 channel: Optional[str] = None):
+        """
+        Constructor of the class.
+
+        Parameters:
+            l1: The in-process cache (BaseCaching or a thread-safe
+                wrapper).
+            l2: The Redis Cache, a new one when None.
+            write_policy: WRITE_THROUGH to cache stored values in L1
+                too, WRITE_AROUND to only write them to Redis.
+            listen: Subscribe to invalidations and keyspace events.
+            channel: The pub/sub channel used for invalidations,
+                INVALIDATION_CHANNEL in the namespace of l2 by default.
+        """
+        if write_policy not in (WRITE_THROUGH, WRITE_AROUND):
+            raise ValueError("write_policy must be 'through' or 'around'")
+        self.l1 = l1
+        self.l2 = l2 if l2 is not None else Cache()
+        self.write_policy = write_policy
+        if channel is None:
+            channel = self.l2._key(INVALIDATION_CHANNEL)
+        self.channel = channel
+        self._listener = None
+        if listen:
+            self.listen()
+
+    def listen(self) -> None:
+        """
+        Start the background thread that drops invalidated L1 entries.
+        Keyspace events are only received when the Redis server has
+        notify-keyspace-events enabled (e.g. "Kg$x"). A key overwritten
+        by SET, even by this process, is dropped from L1 and read again
+        from Redis on the next get.
+        """
+        if self._listener is not None:
+            return
+        redis_client = self.l2._redis
+        db = redis_client.connection_pool.connection_kwargs.get("db", 0)
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: self._on_invalidate})
+        pubsub.psubscribe(**{f"__keyspace@{db}__:*": self._on_keyspace})
+        self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def close(self) -> None:
+        """
+        Stop the invalidation listener, if any.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _on_invalidate(self, message: dict) -> None:
+        """
+        Drop the key named by an invalidation message from L1.
+        """
+        self.l1.delete(message["data"].decode("utf-8"))
+
+    def _on_keyspace(self, message: dict) -> None:
+        """
+        Drop a key from L1 when Redis reports it deleted or expired.
+        """
+        if message["data"].decode("utf-8") in INVALIDATING_EVENTS:
+            channel = message["channel"].decode("utf-8")
+            name = channel.split(":", 1)[1]
+            # Seules les clés du namespace de L2 sont en cache dans L1
+            prefix = self.l2._key("")
+            if name.startswith(prefix):
+                self.l1.delete(name[len(prefix):])
+
+    def store(self, data: Union[str, bytes, int, float],
+              ttl: Optional[int] = None) -> str:
+        """
+        Store a value in Redis, and in L1 with the write-through policy.
+
+        Parameters:
+            data: Data to store. Can be str, bytes, int or float.
+            ttl: Seconds before the value expires, in both tiers.
+
+        Returns:
+            str: The generated key used to store the data.
+        """
+        key = self.l2.store(data, ttl)
+        if self.write_policy == WRITE_THROUGH:
+            # Un Cache typé relit la valeur telle quelle
+            self.l1.put(key, data if self.l2.typed else as_stored(data), ttl)
+        return key
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop a key from L1 here and in every listening process.
+
+        Parameters:
+            key: The key to invalidate.
+        """
+        self.l1.delete(key)
+        self.l2._redis.publish(self.channel, key)
+
+    def get(self, key: str, fn: Optional[Callable] = None) -> Union[
+            str, bytes, int, float, None]:
+        """
+        Retrieve a value from L1, else from Redis (promoting it to L1
+        until its Redis TTL ends). Concurrent L1 misses on the same key
+        share one Redis read.
+        Optionally apply a conversion function `fn` to the result.
+        Returns None if key does not exist.
+        """
+        data = self.l1.get_or_load(key, self._load, with_ttl=True)
+        if data is None:
+            return None
+        if fn is not None:
+            return fn(data)
+        return data
+
+    def _load(self, key: str) -> Tuple[
+            Union[str, bytes, int, float, None], Optional[float]]:
+        """
+        Read a value and its remaining TTL (None without expiry) from
+        Redis in one round trip.
+        """
+        name = self.l2._key(key)
+        pipe = self.l2._redis.pipeline(transaction=False)
+        pipe.get(name)
+        pipe.pttl(name)
+        data, pttl = pipe.execute()
+        # PTTL vaut -1 pour une clé sans expiration
+        return self.l2._decode(data), pttl / 1000 if pttl > 0 else None
+
+    def get_int(self, key: str) -> Optional[int]:
+        """
+        Retrieve a value and convert it to int.
+        Returns None if key does not exist.
+        """
+        return self.get(key, int)
+
+    def get_str(self, key: str) -> Optional[str]:
+        """
+        Retrieve a value and convert it to UTF-8 string.
+        Returns None if key does not exist.
+        """
+        return self.get(key, as_text)
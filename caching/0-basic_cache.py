@@ -3,6 +3,7 @@
 This module defines the BasicCache class that inherits from
 BaseCaching and implements a simple dictionary-based cache.
 """
+import sys
 from base_caching import BaseCaching
 
 
@@ -10,14 +11,19 @@ class BasicCache(BaseCaching):
     """
     BasicCache class that inherits from BaseCaching and
     implements a simple caching system without eviction policy.
+
+    The cache is unbounded by default. Given a max_items (or
+    max_bytes), a full cache refuses the new keys instead of evicting.
     """
-    def __init__(self):
-        super().__init__()
+    MAX_ITEMS = sys.maxsize  # Pas de limite par défaut
+
+    def __init__(self, max_items=None, **options):
+        super().__init__(max_items, **options)
 
     # Redéfinition de la méthode put
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
-        Add an item to the cache.
+        Add an item to the cache, for `ttl` seconds if given.
 
         If key or item is None, the method does nothing.
         Otherwise, it stores the item in the cache dictionary.
@@ -25,7 +31,7 @@ class BasicCache(BaseCaching):
         if key is None or item is None:
             return  # Arrête la fonction en ne faisant rien
         else:
-            self.cache_data[key] = item
+            self._admit(key, item, ttl)
 
     # Redéfinition de la méthode get
     def get(self, key):
@@ -34,7 +40,7 @@ class BasicCache(BaseCaching):
 
         Returns None if the key is None or does not exist.
         """
-        if key is None or key not in self.cache_data:
+        if key is None or key not in self.cache_data or self._expired(key):
             return None
         else:
             return self.cache_data[key]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+This module defines the LFUCache class that inherits from
+BaseCaching and implements a dictionary-based LFU cache.
+"""
+from collections import OrderedDict
+from base_caching import BaseCaching
+
+
+class FrequencyNode:
+    """
+    Bucket of the keys sharing the same access count, linked to the
+    buckets of the neighbouring counts.
+    """
+    __slots__ = ('count', 'keys', 'prev', 'next')
+
+    def __init__(self, count):
+        """
+        Create an empty bucket linked to itself.
+        """
+        self.count = count
+        self.keys = OrderedDict()  # Ordre LRU au sein du bucket
+        self.prev = self
+        self.next = self
+
+
+class LFUCache(BaseCaching):
+    """
+    LFUCache class that inherits from BaseCaching and implements
+    a LFU caching system with eviction when the cache is full.
+
+    Keys are grouped in frequency buckets kept in a doubly linked list
+    sorted by count, so get, put and eviction all run in constant time.
+    Ties inside a bucket are broken by evicting the least recently used.
+    """
+    def __init__(self, max_items=None, **options):
+        super().__init__(max_items, **options)
+        self.head = FrequencyNode(0)  # Sentinelle de la liste des buckets
+        self.nodes = {}  # Clé -> bucket de sa fréquence
+
+    # Redéfinition de la méthode put
+    def put(self, key, item, ttl=None):
+        """
+        Add an item to the cache, for `ttl` seconds if given.
+
+        If key or item is None, the method does nothing.
+        Otherwise, it stores the item in the cache dictionary.
+        """
+        if key is None or item is None:
+            return  # Arrête la fonction en ne faisant rien
+        else:
+            exists = key in self.cache_data
+            if self._admit(key, item, ttl):
+                if exists:
+                    self._touch(key)
+                else:
+                    node = self._node_after(self.head, 1)
+                    node.keys[key] = None
+                    self.nodes[key] = node
+
+    # Redéfinition de la méthode get
+    def get(self, key):
+        """
+        Retrieve an item from the cache by key.
+
+        Returns None if the key is None or does not exist.
+        """
+        if key is None or key not in self.cache_data or self._expired(key):
+            return None
+        else:
+            self._touch(key)
+            return self.cache_data[key]
+
+    def _node_after(self, node, count):
+        """
+        Return the bucket for `count` following `node`, creating it
+        when it doesn't exist yet.
+        """
+        following = node.next
+        if following is not self.head and following.count == count:
+            return following
+        new = FrequencyNode(count)
+        new.prev = node
+        new.next = following
+        node.next = new
+        following.prev = new
+        return new
+
+    def _unlink_if_empty(self, node):
+        """
+        Remove `node` from the bucket list once it holds no key.
+        """
+        if not node.keys:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+
+    def _touch(self, key):
+        """
+        Move `key` to the bucket of the next frequency.
+        """
+        node = self.nodes[key]
+        following = self._node_after(node, node.count + 1)
+        del node.keys[key]
+        following.keys[key] = None
+        self.nodes[key] = following
+        self._unlink_if_empty(node)
+
+    def _victim(self, key):
+        """
+        Return the least frequently used key (other than `key`) to evict,
+        the least recently used one among equals.
+        """
+        node = self.head.next
+        while node is not self.head:
+            for candidate in node.keys:
+                if candidate != key:
+                    return candidate
+            node = node.next
+        return None
+
+    def _forget(self, key):
+        """
+        Remove `key` from its frequency bucket.
+        """
+        node = self.nodes.pop(key)
+        del node.keys[key]
+        self._unlink_if_empty(node)
+
+    def _saved_order(self):
+        """
+        Yield (key, access count) from the least to the most frequently
+        used key, the least recently used first among equals.
+        """
+        node = self.head.next
+        while node is not self.head:
+            for key in node.keys:
+                yield key, node.count
+            node = node.next
+
+    def _restore_entry(self, key, item, ttl, state):
+        """
+        Put back an entry read from a snapshot with its access count.
+        """
+        if key in self.cache_data:
+            self.put(key, item, ttl)
+            return
+        if not self._admit(key, item, ttl):
+            return
+        node = self.head.prev  # Les entrées arrivent par fréquence croissante
+        while node is not self.head and node.count > state:
+            node = node.prev
+        if node is self.head or node.count != state:
+            node = self._node_after(node, state)
+        node.keys[key] = None
+        self.nodes[key] = node
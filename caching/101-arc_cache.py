@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+This module defines the ARCCache class that inherits from
+BaseCaching and implements an Adaptive Replacement Cache.
+"""
+from collections import OrderedDict
+from base_caching import BaseCaching
+
+
+class ARCCache(BaseCaching):
+    """
+    ARCCache class that inherits from BaseCaching and implements
+    an ARC caching system with eviction when the cache is full.
+
+    Cached keys live in two LRU lists: recent (seen once) and frequent
+    (seen at least twice). Evicted keys are remembered in two ghost
+    lists, and hits on those ghosts move the target size of the recent
+    list, so a one-off scan only flushes the recent list while the
+    frequent keys stay cached.
+    """
+    def __init__(self, max_items=None, **options):
+        super().__init__(max_items, **options)
+        self.recent = OrderedDict()  # T1 : clés vues une fois
+        self.frequent = OrderedDict()  # T2 : clés vues plusieurs fois
+        self.recent_ghosts = OrderedDict()  # B1 : clés évincées de T1
+        self.frequent_ghosts = OrderedDict()  # B2 : clés évincées de T2
+        self.target = 0  # Taille visée pour T1 (p)
+        self.ghost_hit = None  # Liste fantôme touchée par le put en cours
+
+    # Redéfinition de la méthode put
+    def put(self, key, item, ttl=None):
+        """
+        Add an item to the cache, for `ttl` seconds if given.
+
+        If key or item is None, the method does nothing.
+        Otherwise, it stores the item in the cache dictionary.
+        """
+        if key is None or item is None:
+            return  # Arrête la fonction en ne faisant rien
+        elif key in self.cache_data:
+            if self._admit(key, item, ttl):
+                self._touch(key)
+        else:
+            self._adapt(key)
+            if self._admit(key, item, ttl):
+                if self.ghost_hit is not None:
+                    self.ghost_hit.pop(key, None)
+                    self.frequent[key] = None
+                else:
+                    self.recent[key] = None
+            self.ghost_hit = None
+
+    # Redéfinition de la méthode get
+    def get(self, key):
+        """
+        Retrieve an item from the cache by key.
+
+        Returns None if the key is None or does not exist.
+        """
+        if key is None or key not in self.cache_data or self._expired(key):
+            return None
+        else:
+            self._touch(key)
+            return self.cache_data[key]
+
+    def _touch(self, key):
+        """
+        Move a cached key to the most recent end of the frequent list.
+        """
+        self.recent.pop(key, None)
+        self.frequent[key] = None
+        self.frequent.move_to_end(key)
+
+    def _adapt(self, key):
+        """
+        Update the target size of the recent list on a ghost hit,
+        and keep the ghost lists bounded on a real miss.
+        """
+        capacity = self.max_items
+        if key in self.recent_ghosts:
+            # Un fantôme récent revient : T1 était trop petit
+            step = max(len(self.frequent_ghosts) /
+                       len(self.recent_ghosts), 1)
+            self.target = min(capacity, self.target + step)
+            self.ghost_hit = self.recent_ghosts
+        elif key in self.frequent_ghosts:
+            # Un fantôme fréquent revient : T2 était trop petit
+            step = max(len(self.recent_ghosts) /
+                       len(self.frequent_ghosts), 1)
+            self.target = max(0, self.target - step)
+            self.ghost_hit = self.frequent_ghosts
+        elif len(self.recent) + len(self.recent_ghosts) >= capacity:
+            if self.recent_ghosts:
+                self.recent_ghosts.popitem(last=False)
+        elif (len(self.cache_data) + len(self.recent_ghosts) +
+              len(self.frequent_ghosts)) >= 2 * capacity:
+            if self.frequent_ghosts:
+                self.frequent_ghosts.popitem(last=False)
+
+    def _victim(self, key):
+        """
+        Return the key (other than `key`) to evict: the LRU key of the
+        recent list while it exceeds its target, of the frequent list
+        otherwise.
+        """
+        recent_size = len(self.recent) - (key in self.recent)
+        from_recent = recent_size > 0 and (
+            recent_size > self.target or
+            (self.ghost_hit is self.frequent_ghosts and
+             recent_size == self.target))
+        lists = (self.recent, self.frequent) if from_recent \
+            else (self.frequent, self.recent)
+        for keys in lists:
+            for candidate in keys:
+                if candidate != key:
+                    return candidate
+        return None
+
+    def _forget(self, key):
+        """
+        Remove `key` from its list and remember it as a ghost.
+        """
+        if key in self.recent:
+            del self.recent[key]
+            ghosts = self.recent_ghosts
+        else:
+            del self.frequent[key]
+            ghosts = self.frequent_ghosts
+        ghosts[key] = None
+        if len(ghosts) > self.max_items:
+            ghosts.popitem(last=False)
+
+    def _saved_order(self):
+        """
+        Yield (key, True when frequent), the recent list first, each
+        list from the least to the most recently used.
+        """
+        for key in self.recent:
+            yield key, False
+        for key in self.frequent:
+            yield key, True
+
+    def _restore_entry(self, key, item, ttl, state):
+        """
+        Put back an entry read from a snapshot in its list.
+        """
+        if key in self.cache_data:
+            self.put(key, item, ttl)
+            return
+        if not self._admit(key, item, ttl):
+            return
+        if state:
+            self.frequent[key] = None
+        else:
+            self.recent[key] = None
+
+    def _saved_state(self):
+        """
+        Return the target size of the recent list and the ghost lists.
+        """
+        return (self.target, list(self.recent_ghosts),
+                list(self.frequent_ghosts))
+
+    def _restore_state(self, state):
+        """
+        Put back the target size and the ghost lists.
+        """
+        target, recent_ghosts, frequent_ghosts = state
+        self.target = target
+        self.recent_ghosts = OrderedDict.fromkeys(recent_ghosts)
+        self.frequent_ghosts = OrderedDict.fromkeys(frequent_ghosts)
@@ -11,13 +11,13 @@ class LIFOCache(BaseCaching):
     LIFOCache class that inherits from BaseCaching and implements
     a LIFO caching system with eviction when the cache is full.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, max_items=None, **options):
+        super().__init__(max_items, **options)
 
     # Redéfinition de la méthode put
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
-        Add an item to the cache.
+        Add an item to the cache, for `ttl` seconds if given.
 
         If key or item is None, the method does nothing.
         Otherwise, it stores the item in the cache dictionary.
@@ -25,15 +25,16 @@ class LIFOCache(BaseCaching):
         if key is None or item is None:
             return  # Arrête la fonction en ne faisant rien
         else:
-            if (len(self.cache_data) < BaseCaching.MAX_ITEMS):
-                self.cache_data[key] = item  # Ajout de l'item
-            else:
-                # Récupération de la dernière clé
-                last_key = next(reversed(self.cache_data))
-                self.cache_data[key] = item  # Ajout de l'item
-                if (len(self.cache_data) > BaseCaching.MAX_ITEMS):
-                    del self.cache_data[last_key]  # Supprime l'item
-                    print("DISCARD: " + last_key)
+            self._admit(key, item, ttl)
+
+    def _victim(self, key):
+        """
+        Return the last inserted key (other than `key`) to evict.
+        """
+        for last_key in reversed(self.cache_data):  # Récupère la dernière clé
+            if last_key != key:
+                return last_key
+        return None
 
     # Redéfinition de la méthode get
     def get(self, key):
@@ -42,7 +43,13 @@ class LIFOCache(BaseCaching):
 
         Returns None if the key is None or does not exist.
         """
-        if key is None or key not in self.cache_data:
+        if key is None or key not in self.cache_data or self._expired(key):
             return None
         else:
             return self.cache_data[key]
+
+    def _touch_many(self, keys):
+        """
+        Hits don't change the eviction order.
+        """
+        pass
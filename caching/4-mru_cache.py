@@ -3,6 +3,7 @@
 This module defines the MRUCache class that inherits from
 BaseCaching and implements a dictionary-based MRU cache.
 """
+from collections import OrderedDict
 from base_caching import BaseCaching
 
 
@@ -10,15 +11,19 @@ class MRUCache(BaseCaching):
     """
     MRUCache class that inherits from BaseCaching and implements
     a MRU caching system with eviction when the cache is full.
+
+    The items are kept in an OrderedDict sorted by recency (most
+    recent last), so that get, put and eviction all run in constant
+    time without a separate list of keys.
     """
-    def __init__(self):
-        super().__init__()
-        self.order = []
+    def __init__(self, max_items=None, **options):
+        super().__init__(max_items, **options)
+        self.cache_data = OrderedDict()
 
     # Redéfinition de la méthode put
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
-        Add an item to the cache.
+        Add an item to the cache, for `ttl` seconds if given.
 
         If key or item is None, the method does nothing.
         Otherwise, it stores the item in the cache dictionary.
@@ -26,15 +31,8 @@ class MRUCache(BaseCaching):
         if key is None or item is None:
             return  # Arrête la fonction en ne faisant rien
         else:
-            if key in self.cache_data:  # Si la clé existe dans le cache
-                self.order.remove(key)  # On la retire de notre tableau order
-            self.order.append(key)  # On l'ajoute à notre tableau order
-            self.cache_data[key] = item
-
-            if len(self.cache_data) > self.MAX_ITEMS:
-                most_recent = self.order.pop(-2)
-                del self.cache_data[most_recent]
-                print(f"DISCARD: {most_recent}")
+            if self._admit(key, item, ttl):
+                self._touch(key)  # La clé devient la plus récente
 
     # Redéfinition de la méthode get
     def get(self, key):
@@ -43,9 +41,31 @@ class MRUCache(BaseCaching):
 
         Returns None if the key is None or does not exist.
         """
-        if key is None or key not in self.cache_data:
+        if key is None or key not in self.cache_data or self._expired(key):
             return None
         else:
-            self.order.remove(key)
-            self.order.append(key)
+            self._touch(key)
             return self.cache_data[key]
+
+    def _victim(self, key):
+        """
+        Return the most recently used key (other than `key`) to evict.
+        """
+        for candidate in reversed(self.cache_data):
+            if candidate != key:
+                return candidate
+        return None
+
+    def _touch(self, key):
+        """
+        Make `key` the most recently used.
+        """
+        self.cache_data.move_to_end(key)
+
+    def _touch_many(self, keys):
+        """
+        Make each of `keys`, in order, the most recently used.
+        """
+        move_to_end = self.cache_data.move_to_end
+        for key in keys:
+            move_to_end(key)
@@ -2,28 +2,186 @@
 """
 BaseCaching module
 """
+import heapq
+import pickle
+import sys
+import threading
+import time
+
+
+class LatencyHistogram():
+    """ LatencyHistogram counts durations in power-of-two buckets
+    of nanoseconds
+    """
+    __slots__ = ('counts',)
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.counts = [0] * 64
+
+    def record(self, nanoseconds):
+        """ Count one duration
+        """
+        self.counts[nanoseconds.bit_length()] += 1
+
+    def merge(self, other):
+        """ Add the counts of another histogram
+        """
+        for bucket, count in enumerate(other.counts):
+            self.counts[bucket] += count
+
+    def percentile(self, percent):
+        """ Return the upper bound (in ns) of the bucket holding
+        the given percentile, or None when nothing was recorded
+        """
+        total = sum(self.counts)
+        if total == 0:
+            return None
+        rank = total * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return 1 << bucket
+        return 1 << (len(self.counts) - 1)
+
+
+class CacheStats():
+    """ CacheStats holds the counters of a cache, and the latency
+    histograms of get and put when timing is enabled
+    """
+    __slots__ = ('hits', 'misses', 'inserts', 'evictions', 'expirations',
+                 'get_latency', 'put_latency')
+
+    def __init__(self, timed=False):
+        """ Initiliaze
+        """
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.get_latency = LatencyHistogram() if timed else None
+        self.put_latency = LatencyHistogram() if timed else None
+
+
+class CacheEntry():
+    """ CacheEntry holds the metadata of a cached key (its size and
+    expiry date); entries are ordered by expiry date in the heap of
+    deadlines
+    """
+    __slots__ = ('key', 'size', 'expires')
+
+    def __init__(self, key, size, expires):
+        """ Initiliaze
+        """
+        self.key = key
+        self.size = size
+        self.expires = expires
+
+    def __lt__(self, other):
+        """ Compare the expiry dates
+        """
+        return self.expires < other.expires
+
+
+class SingleFlight():
+    """ SingleFlight runs at most one call per key at a time: the
+    threads asking for a key already being computed wait for that
+    call and share its result (or its exception)
+    """
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.lock = threading.Lock()
+        self.calls = {}  # Clé -> (événement, [résultat, erreur])
+
+    def do(self, key, function):
+        """ Return function(), or the result of the call already
+        running for `key`
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = (threading.Event(), [None, None])
+        done, outcome = call
+        if not leader:
+            done.wait()
+            if outcome[1] is not None:
+                raise outcome[1]
+            return outcome[0]
+        try:
+            outcome[0] = function()
+            return outcome[0]
+        except BaseException as error:
+            outcome[1] = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            done.set()
 
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the capacity of each instance (MAX_ITEMS by default)
+      - an optional memory budget (max_bytes), each item being
+        measured by `sizer` (sys.getsizeof by default)
+      - an optional time to live for the entries (default_ttl, or
+        per entry with put(key, item, ttl)); expired entries are
+        dropped lazily by get and a few at a time by each put
+      - the callback told about each eviction (on_evict, which
+        prints DISCARD by default)
+      - optional statistics, see enable_stats
+      - an optional write-through hook (writer), called by write
+        before the item is cached
+      - snapshot and restore, to save the entries in eviction order
+        to a file and reload them (e.g. at startup)
     """
     MAX_ITEMS = 4
+    SWEEP_STEP = 2
+    SNAPSHOT_MAGIC = b"BaseCaching snapshot 2\n"
+    SNAPSHOT_CHUNK = 4096
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 default_ttl=None, on_evict=None, writer=None):
         """ Initiliaze
         """
+        if max_items is None:
+            max_items = self.MAX_ITEMS
+        if max_items < 1:
+            raise ValueError("max_items must be a positive integer")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be a positive integer")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer if sizer is not None else sys.getsizeof
         self.cache_data = {}
+        self.current_bytes = 0
+        self.default_ttl = default_ttl
+        # Clé -> CacheEntry, seulement avec un budget mémoire ou un TTL
+        self.meta = {}
+        self.deadlines = []  # Tas des CacheEntry qui expirent
+        if on_evict is None:
+            on_evict = self.report_discard
+        self.on_evict = on_evict
+        self.stats = None
+        self.writer = writer
+        self.flights = SingleFlight()
 
     def print_cache(self):
         """ Print the cache
         """
+        self.expire()
         print("Current cache:")
         for key in sorted(self.cache_data.keys()):
             print("{}: {}".format(key, self.cache_data.get(key)))
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
         """
         raise NotImplementedError("put must be implemented\
@@ -34,3 +192,366 @@ class BaseCaching():
         """
         raise NotImplementedError("get must be implemented\
                                    in your cache class")
+
+    def _peek(self, key):
+        """ Get an item by key with the policy get, without counting
+        the lookup in the statistics
+        """
+        return type(self).get(self, key)
+
+    def delete(self, key):
+        """ Remove `key` from the cache, without reporting it as an
+        eviction. Returns True when the key was cached.
+        """
+        if key is None or key not in self.cache_data:
+            return False
+        self._remove(key)
+        return True
+
+    def get_many(self, keys):
+        """ Get the items of `keys`, in the same order, with None for
+        the missing ones. The policy bookkeeping (recency, frequency)
+        is updated in one pass once all the keys are looked up.
+        """
+        data = self.cache_data
+        meta = self.meta
+        items = []
+        found = []
+        for key in keys:
+            if key is None or key not in data or \
+                    (meta and self._expired(key)):
+                items.append(None)
+            else:
+                items.append(data[key])
+                found.append(key)
+        self._touch_many(found)
+        if self.stats is not None:
+            self.stats.hits += len(found)
+            self.stats.misses += len(items) - len(found)
+        return items
+
+    def put_many(self, items, ttl=None):
+        """ Add all the items of a mapping (or of an iterable of
+        (key, item) pairs) in the cache, in order
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        put = self.put
+        for key, item in items:
+            put(key, item, ttl)
+
+    def get_or_load(self, key, loader, ttl=None, with_ttl=False):
+        """ Get an item by key, calling loader(key) and caching its
+        result on a miss, for `ttl` seconds. With `with_ttl`, the
+        loader returns (item, ttl) to give the TTL of each item it
+        loads. Concurrent misses on the same key share a single
+        loader call.
+        """
+        item = self.get(key)
+        if item is not None or key is None:
+            return item
+        return self.flights.do(
+            key, lambda: self._load(key, loader, ttl, with_ttl))
+
+    def _load(self, key, loader, ttl, with_ttl=False):
+        """ Load and cache the item of `key`, unless a call that just
+        finished already did. The miss was already counted by
+        get_or_load, so this second lookup isn't.
+        """
+        item = self._peek(key)
+        if item is None:
+            item = loader(key)
+            if with_ttl:
+                item, ttl = item
+            if item is not None:
+                self.put(key, item, ttl)
+        return item
+
+    def write(self, key, item, ttl=None):
+        """ Write an item to the backing store (writer), then cache it
+        """
+        if self.writer is not None:
+            self.writer(key, item)
+        self.put(key, item, ttl)
+
+    def snapshot(self, path):
+        """ Write the entries to the file `path`, oldest first for the
+        policy, with their expiry date (wall clock, so that it still
+        holds in another process) and policy state.
+
+        Entries are pickled by chunks of SNAPSHOT_CHUNK, so the
+        snapshot is never built as a whole in memory.
+        """
+        self.expire()
+        # Échéances converties de l'horloge monotone à l'heure murale
+        offset = time.time() - time.monotonic()
+        with open(path, "wb") as file:
+            file.write(self.SNAPSHOT_MAGIC)
+            pickle.dump(self._saved_state(), file, pickle.HIGHEST_PROTOCOL)
+            chunk = []
+            for key, state in self._saved_order():
+                deadline = None
+                entry = self.meta.get(key)
+                if entry is not None and entry.expires is not None:
+                    deadline = entry.expires + offset
+                chunk.append((key, self.cache_data[key], deadline, state))
+                if len(chunk) == self.SNAPSHOT_CHUNK:
+                    pickle.dump(chunk, file, pickle.HIGHEST_PROTOCOL)
+                    chunk = []
+            if chunk:
+                pickle.dump(chunk, file, pickle.HIGHEST_PROTOCOL)
+
+    def restore(self, path):
+        """ Load the entries written by snapshot to the file `path`,
+        rebuilding the policy order, and return how many were read.
+        Entries whose expiry date has passed since are skipped.
+        """
+        count = 0
+        with open(path, "rb") as file:
+            if file.read(len(self.SNAPSHOT_MAGIC)) != self.SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a cache snapshot".format(path))
+            policy_state = pickle.load(file)
+            while True:
+                try:
+                    chunk = pickle.load(file)
+                except EOFError:
+                    self._restore_state(policy_state)
+                    return count
+                now = time.time()
+                for key, item, deadline, state in chunk:
+                    if deadline is None:
+                        self._restore_entry(key, item, None, state)
+                    elif deadline > now:
+                        self._restore_entry(key, item, deadline - now, state)
+                count += len(chunk)
+
+    def _saved_order(self):
+        """ Yield (key, policy state) for every entry, in the order
+        restore must put them back
+        """
+        for key in self.cache_data:
+            yield key, None
+
+    def _restore_entry(self, key, item, ttl, state):
+        """ Put back an entry read from a snapshot
+        """
+        self.put(key, item, ttl)
+
+    def _saved_state(self):
+        """ Return the policy state that isn't tied to an entry
+        """
+        return None
+
+    def _restore_state(self, state):
+        """ Put back the policy state once the entries are restored
+        """
+        pass
+
+    def report_discard(self, key, item):
+        """ Print the evicted key (default on_evict callback)
+        """
+        print("DISCARD: {}".format(key))
+
+    def enable_stats(self, timed=False):
+        """ Start counting hits, misses, inserts, evictions and
+        expirations, and with `timed` the latency of get and put.
+
+        Until this is called, the only cost of the statistics is an
+        attribute check on inserts, evictions and expirations.
+        """
+        self.stats = CacheStats(timed)
+        policy_get = type(self).get
+        policy_put = type(self).put
+        stats = self.stats
+        clock = time.perf_counter_ns
+
+        def get(key):
+            """ Get an item by key, counting hits and misses
+            """
+            start = clock() if timed else 0
+            item = policy_get(self, key)
+            if timed:
+                stats.get_latency.record(clock() - start)
+            if item is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+            return item
+
+        def put(key, item, *ttl):
+            """ Add an item in the cache, timing it
+            """
+            start = clock()
+            policy_put(self, key, item, *ttl)
+            stats.put_latency.record(clock() - start)
+
+        # Les méthodes instrumentées masquent celles de la classe
+        self.get = get
+        if timed:
+            self.put = put
+
+    def disable_stats(self):
+        """ Stop collecting statistics
+        """
+        self.stats = None
+        self.__dict__.pop("get", None)
+        self.__dict__.pop("put", None)
+
+    def statistics(self):
+        """ Return the statistics as a dictionary, or None when
+        they are disabled
+        """
+        stats = self.stats
+        if stats is None:
+            return None
+        lookups = stats.hits + stats.misses
+        result = {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "hit_rate": stats.hits / lookups if lookups else 0.0,
+            "inserts": stats.inserts,
+            "evictions": stats.evictions,
+            "expirations": stats.expirations,
+            "size": len(self.cache_data),
+            "bytes": self.current_bytes,
+        }
+        for name in ("get_latency", "put_latency"):
+            histogram = getattr(stats, name)
+            if histogram is not None:
+                result[name] = {percent: histogram.percentile(percent)
+                                for percent in (50, 90, 99)}
+        return result
+
+    def expire(self, limit=None, keep=None):
+        """ Drop the expired entries (except `keep`), at most `limit`
+        of them, and return how many were dropped
+        """
+        now = time.monotonic()
+        dropped = 0
+        while self.deadlines and self.deadlines[0].expires <= now:
+            if limit is not None and dropped >= limit:
+                break
+            entry = heapq.heappop(self.deadlines)
+            # Ignore les entrées remplacées par un put plus récent
+            if entry.key != keep and self.meta.get(entry.key) is entry:
+                self._remove(entry.key)
+                dropped += 1
+        if dropped and self.stats is not None:
+            self.stats.expirations += dropped
+        return dropped
+
+    def _expired(self, key):
+        """ Drop `key` and return True when its entry has expired
+        """
+        entry = self.meta.get(key)
+        if entry is not None and entry.expires is not None and \
+                entry.expires <= time.monotonic():
+            self._remove(key)
+            if self.stats is not None:
+                self.stats.expirations += 1
+            return True
+        return False
+
+    def _set_entry(self, key, size, ttl):
+        """ Record the size of `key` and its expiry date, `ttl` seconds
+        from now; no entry is kept when neither is needed
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        previous = self.meta.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= previous.size
+        if ttl is None and self.max_bytes is None:
+            return
+        expires = None if ttl is None else time.monotonic() + ttl
+        entry = self.meta[key] = CacheEntry(key, size, expires)
+        self.current_bytes += size
+        if expires is not None:
+            heapq.heappush(self.deadlines, entry)
+            if len(self.deadlines) > 2 * len(self.meta) + 64:
+                # Trop d'entrées périmées dans le tas : on le reconstruit
+                self.deadlines = [entry for entry in self.meta.values()
+                                  if entry.expires is not None]
+                heapq.heapify(self.deadlines)
+
+    def _victim(self, key):
+        """ Return the key to evict to make room for `key`,
+        or None when the policy never evicts
+        """
+        return None
+
+    def _forget(self, key):
+        """ Drop `key` from the policy bookkeeping (order, frequency...)
+        """
+        pass
+
+    def _touch(self, key):
+        """ Record a hit on `key` in the policy bookkeeping
+        """
+        pass
+
+    def _touch_many(self, keys):
+        """ Record a hit on each of `keys`, in order
+        """
+        touch = self._touch
+        for key in keys:
+            touch(key)
+
+    def _is_full(self, key, size):
+        """ Tell whether storing `size` bytes under `key` needs an eviction
+        """
+        if key not in self.cache_data and \
+                len(self.cache_data) >= self.max_items:
+            return True
+        if self.max_bytes is None:
+            return False
+        previous = self.meta.get(key)
+        used = self.current_bytes
+        if previous is not None:
+            used -= previous.size
+        return used + size > self.max_bytes
+
+    def _admit(self, key, item, ttl=None):
+        """ Evict entries until `item` fits, then store it under `key`
+        for `ttl` seconds (default_ttl when None).
+
+        Returns False (and drops any previous value of `key`) when the
+        item can't fit in the cache at all.
+        """
+        if self.deadlines:
+            self.expire(self.SWEEP_STEP, keep=key)
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizer(item)
+            if size > self.max_bytes:
+                if key in self.cache_data:
+                    self._remove(key)
+                return False
+        while self._is_full(key, size):
+            victim = self._victim(key)
+            if victim is None:
+                return False
+            self._discard(victim)
+        if self.stats is not None and key not in self.cache_data:
+            self.stats.inserts += 1
+        self.cache_data[key] = item
+        self._set_entry(key, size, ttl)
+        return True
+
+    def _remove(self, key):
+        """ Remove `key` from the cache and return its item
+        """
+        item = self.cache_data.pop(key)
+        entry = self.meta.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+        self._forget(key)
+        return item
+
+    def _discard(self, key):
+        """ Evict `key` from the cache and report it to on_evict
+        """
+        item = self._remove(key)
+        if self.stats is not None:
+            self.stats.evictions += 1
+        self.on_evict(key, item)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the caching policies.
+
+Usage: ./benchmark.py
+"""
+import itertools
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from simulator import hit_ratio, mixed_trace, quiet, zipf_trace
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ARCCache = __import__('101-arc_cache').ARCCache
+threadsafe_caching = __import__('threadsafe_caching')
+
+POLICIES = [FIFOCache, LRUCache, MRUCache, LFUCache, ARCCache]
+
+
+SIZES = [4, 100, 10_000, 100_000, 1_000_000]
+
+
+def fill(cache, size):
+    """
+    Fill a cache with `size` entries, keys being 0 .. size - 1.
+    """
+    for key in range(size):
+        cache.put(key, key)
+    return cache
+
+
+def time_per_op(cache, size, ops=100_000):
+    """
+    Measure the mean latency (in nanoseconds) of a mixed workload
+    of hits and evicting puts on a cache holding `size` entries.
+    """
+    keys = [random.randrange(size) for _ in range(ops)]
+    next_key = size
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        if i % 2:
+            cache.get(key)
+        else:
+            cache.put(next_key, next_key)  # Provoque une éviction
+            next_key += 1
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def bench_latency(cache_class, sizes=SIZES):
+    """
+    Print the per-operation latency of `cache_class` for each size.
+    """
+    print("{} per-op latency".format(cache_class.__name__))
+    for size in sizes:
+        cache = fill(cache_class(size, on_evict=quiet), size)
+        print("{:>9} entries: {:8.0f} ns/op".format(
+            size, time_per_op(cache, size)))
+
+
+def bench_hit_ratio(capacity=1_000, length=200_000):
+    """
+    Print the hit ratio of every policy on Zipf and scan-mixed traces.
+    """
+    traces = [("zipf", zipf_trace(length)),
+              ("scan-mixed", mixed_trace(length))]
+    print("Hit ratio, capacity {}".format(capacity))
+    for name, trace in traces:
+        print("{:>10}: ".format(name) + "  ".join(
+            "{} {:.3f}".format(policy.__name__,
+                               hit_ratio(policy(capacity, on_evict=quiet),
+                                         trace))
+            for policy in POLICIES))
+
+
+def throughput(cache, threads, trace, ops=50_000):
+    """
+    Run `ops` accesses of `trace` in each of `threads` threads sharing
+    `cache`, and return the total number of operations per second.
+    """
+    def worker(offset):
+        for key in itertools.islice(itertools.cycle(trace), offset,
+                                    offset + ops):
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    workers = [threading.Thread(target=worker, args=(i * 7919,))
+               for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+def bench_threads(capacity=1_000, thread_counts=(1, 2, 4, 8)):
+    """
+    Print the throughput of a single-lock and a striped LRU cache
+    shared by a growing number of threads.
+    """
+    trace = zipf_trace(100_000)
+    caches = [
+        ("synchronized", lambda: threadsafe_caching.SynchronizedCache(
+            LRUCache(capacity, on_evict=quiet))),
+        ("striped", lambda: threadsafe_caching.StripedCache(
+            LRUCache, capacity, on_evict=quiet)),
+    ]
+    print("Shared LRU throughput, capacity {}".format(capacity))
+    for name, make in caches:
+        print("{:>12}: ".format(name) + "  ".join(
+            "{} threads {:>9.0f} ops/s".format(
+                threads, throughput(make(), threads, trace))
+            for threads in thread_counts))
+
+
+def bench_batch(capacity=10_000, batch=50, requests=2_000):
+    """
+    Print the time per key of get/put loops versus get_many/put_many,
+    on a plain and on a synchronized LRU cache.
+    """
+    batches = [random.sample(range(2 * capacity), batch)
+               for _ in range(requests)]
+
+    def looped(cache):
+        for keys in batches:
+            for key in keys:
+                cache.get(key)
+            for key in keys:
+                cache.put(key, key)
+
+    def batched(cache):
+        for keys in batches:
+            cache.get_many(keys)
+            cache.put_many(zip(keys, keys))
+
+    print("Batched access, {} keys per batch".format(batch))
+    for name, make in [
+            ("LRUCache", lambda: LRUCache(capacity, on_evict=quiet)),
+            ("synchronized", lambda: threadsafe_caching.SynchronizedCache(
+                LRUCache(capacity, on_evict=quiet)))]:
+        timings = []
+        for run in (looped, batched):
+            start = time.perf_counter()
+            run(make())
+            timings.append((time.perf_counter() - start) /
+                           (2 * batch * requests) * 1e9)
+        print("{:>12}: loop {:6.0f} ns/key  batch {:6.0f} ns/key".format(
+            name, *timings))
+
+
+def bytes_per_entry(make, entries=100_000, **put_options):
+    """
+    Return the memory allocated per entry by filling the cache built
+    by `make` with `entries` small int items.
+    """
+    keys = ["key{}".format(i) for i in range(entries)]
+    tracemalloc.start()
+    cache = make()
+    before = tracemalloc.get_traced_memory()[0]
+    for key in keys:
+        cache.put(key, 1, **put_options)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / entries
+
+
+def bench_memory(entries=100_000):
+    """
+    Print the bookkeeping memory per entry of each policy, plain and
+    with a TTL and a byte budget (keys and items are not counted).
+    """
+    print("Memory per entry, {} entries".format(entries))
+    for policy in POLICIES:
+        plain = bytes_per_entry(lambda: policy(entries, on_evict=quiet),
+                                entries)
+        full = bytes_per_entry(lambda: policy(entries, on_evict=quiet,
+                                              max_bytes=1 << 40),
+                               entries, ttl=3600)
+        print("{:>10}: plain {:5.0f} B  ttl+bytes {:5.0f} B".format(
+            policy.__name__, plain, full))
+
+
+def bench_snapshot(entries=1_000_000, policies=(LRUCache, LFUCache)):
+    """
+    Print the time to snapshot and restore `entries` entries, and the
+    size of the snapshot file.
+    """
+    print("Snapshot and restore, {} entries".format(entries))
+    for policy in policies:
+        cache = fill(policy(entries, on_evict=quiet), entries)
+        path = os.path.join(tempfile.mkdtemp(), "cache.snapshot")
+        start = time.perf_counter()
+        cache.snapshot(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        policy(entries, on_evict=quiet).restore(path)
+        loaded = time.perf_counter() - start
+        print("{:>10}: snapshot {:5.2f} s  restore {:5.2f} s  "
+              "file {:5.1f} MB".format(policy.__name__, saved, loaded,
+                                       os.path.getsize(path) / 1e6))
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    bench_latency(LRUCache)
+    bench_latency(MRUCache)
+    bench_latency(LFUCache)
+    bench_latency(ARCCache)
+    bench_hit_ratio()
+    bench_threads()
+    bench_batch()
+    bench_memory()
+    bench_snapshot()
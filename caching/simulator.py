@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Cache policy simulator: replays recorded or synthetic access traces
+against every caching policy at several capacities, and reports the
+hit ratio, the throughput and the peak memory of each run.
+
+Usage: ./simulator.py [-w zipf,loop,scan,mixed] [-t trace.txt]
+                      [-c 100,1000,10000] [-n 200000]
+"""
+import argparse
+import itertools
+import random
+import time
+import tracemalloc
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ARCCache = __import__('101-arc_cache').ARCCache
+
+POLICIES = [FIFOCache, LIFOCache, LRUCache, MRUCache, LFUCache, ARCCache]
+
+
+def quiet(key, item):
+    """
+    Eviction callback that reports nothing.
+    """
+
+
+def zipf_trace(length, keys=10_000, skew=1.0):
+    """
+    Return `length` keys drawn from a Zipf distribution over `keys` keys.
+    """
+    weights = itertools.accumulate(1 / rank ** skew
+                                   for rank in range(1, keys + 1))
+    return random.choices(range(keys), cum_weights=list(weights), k=length)
+
+
+def loop_trace(length, keys=10_000):
+    """
+    Return `length` keys cycling over the same `keys` keys.
+    """
+    return list(itertools.islice(itertools.cycle(range(keys)), length))
+
+
+def scan_trace(length):
+    """
+    Return `length` distinct keys, each one accessed once.
+    """
+    return list(range(length))
+
+
+def mixed_trace(length, keys=10_000, scan=5_000, every=20_000):
+    """
+    Return a Zipf trace interrupted every `every` accesses by a scan
+    of `scan` keys that are never seen again.
+    """
+    trace = []
+    fresh = keys  # Les clés de scan sont hors de l'espace Zipf
+    for start in range(0, length, every):
+        trace.extend(zipf_trace(min(every, length - start), keys))
+        trace.extend(range(fresh, fresh + scan))
+        fresh += scan
+    return trace
+
+
+WORKLOADS = {
+    "zipf": zipf_trace,
+    "loop": loop_trace,
+    "scan": scan_trace,
+    "mixed": mixed_trace,
+}
+
+
+def load_trace(path):
+    """
+    Return the keys of a recorded trace file, one key per line.
+    """
+    with open(path) as file:
+        return [line.rstrip("\n") for line in file if line.strip()]
+
+
+def hit_ratio(cache, trace):
+    """
+    Replay `trace` on `cache` (get, then put on a miss) and return
+    the fraction of hits.
+    """
+    hits = 0
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+        else:
+            hits += 1
+    return hits / len(trace)
+
+
+def simulate(policy, capacity, trace):
+    """
+    Replay `trace` on a new cache of `policy` holding `capacity` items,
+    and return its hit ratio, operations per second and peak memory
+    (in bytes, measured on a second run under tracemalloc).
+    """
+    start = time.perf_counter()
+    ratio = hit_ratio(policy(capacity, on_evict=quiet), trace)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    hit_ratio(policy(capacity, on_evict=quiet), trace)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "hit_ratio": ratio,
+        "ops_per_sec": len(trace) / elapsed,
+        "peak_memory": peak,
+    }
+
+
+def report(name, trace, capacities, policies=POLICIES):
+    """
+    Print the results of every policy at every capacity for a trace.
+    """
+    print("{} ({} accesses)".format(name, len(trace)))
+    print("{:>10} {:>10} {:>9} {:>12} {:>10}".format(
+        "capacity", "policy", "hit ratio", "ops/s", "peak MB"))
+    for capacity in capacities:
+        for policy in policies:
+            result = simulate(policy, capacity, trace)
+            print("{:>10} {:>10} {:>9.3f} {:>12.0f} {:>10.1f}".format(
+                capacity, policy.__name__, result["hit_ratio"],
+                result["ops_per_sec"], result["peak_memory"] / 1e6))
+    print()
+
+
+def main():
+    """
+    Parse the command line and run the simulations.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-w", "--workloads", default="zipf,loop,scan,mixed",
+                        help="synthetic traces: " + ",".join(WORKLOADS))
+    parser.add_argument("-t", "--trace", action="append", default=[],
+                        help="recorded trace file (one key per line)")
+    parser.add_argument("-c", "--capacities", default="100,1000,10000",
+                        help="comma separated cache capacities")
+    parser.add_argument("-n", "--length", type=int, default=200_000,
+                        help="length of the synthetic traces")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="random seed of the synthetic traces")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    capacities = [int(capacity) for capacity in args.capacities.split(",")]
+    for path in args.trace:
+        report(path, load_trace(path), capacities)
+    for name in filter(None, args.workloads.split(",")):
+        if name not in WORKLOADS:
+            parser.error("unknown workload: {}".format(name))
+        report(name, WORKLOADS[name](args.length), capacities)
+
+
+if __name__ == "__main__":
+    main()
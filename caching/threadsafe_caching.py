@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+This module defines thread-safe wrappers around the caching policies:
+SynchronizedCache guards one cache with a single lock, StripedCache
+spreads the keys over several independently locked caches.
+"""
+import threading
+from base_caching import LatencyHistogram, SingleFlight
+
+
+class SynchronizedCache():
+    """
+    SynchronizedCache wraps a cache so that each operation runs
+    under one lock. The policy stays exact (one global order) but
+    all threads serialize on that lock.
+    """
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.RLock()
+        self.flights = SingleFlight()
+
+    @property
+    def cache_data(self):
+        """
+        Return a copy of the cached items.
+        """
+        with self.lock:
+            return dict(self.cache.cache_data)
+
+    def print_cache(self):
+        """
+        Print the cache.
+        """
+        with self.lock:
+            self.cache.print_cache()
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item to the cache, for `ttl` seconds if given.
+        """
+        with self.lock:
+            self.cache.put(key, item, ttl)
+
+    def get(self, key):
+        """
+        Retrieve an item from the cache by key.
+        """
+        with self.lock:
+            return self.cache.get(key)
+
+    def delete(self, key):
+        """
+        Remove `key` from the cache.
+        """
+        with self.lock:
+            return self.cache.delete(key)
+
+    def get_many(self, keys):
+        """
+        Retrieve the items of `keys` under a single lock acquisition.
+        """
+        with self.lock:
+            return self.cache.get_many(keys)
+
+    def put_many(self, items, ttl=None):
+        """
+        Add many items under a single lock acquisition.
+        """
+        with self.lock:
+            self.cache.put_many(items, ttl)
+
+    def get_or_load(self, key, loader, ttl=None, with_ttl=False):
+        """
+        Get an item by key, calling loader(key) on a miss (see
+        BaseCaching.get_or_load). The loader runs without the lock,
+        once per key for concurrent misses.
+        """
+        item = self.get(key)
+        if item is not None or key is None:
+            return item
+        return self.flights.do(
+            key, lambda: self._load(key, loader, ttl, with_ttl))
+
+    def _load(self, key, loader, ttl, with_ttl=False):
+        """
+        Load and cache the item of `key`, unless a call that just
+        finished already did. This lookup isn't counted in the
+        statistics, get_or_load already counted the miss.
+        """
+        with self.lock:
+            item = self.cache._peek(key)
+        if item is None:
+            item = loader(key)
+            if with_ttl:
+                item, ttl = item
+            if item is not None:
+                self.put(key, item, ttl)
+        return item
+
+    def write(self, key, item, ttl=None):
+        """
+        Write an item to the backing store of the cache (without
+        holding the lock), then cache it.
+        """
+        if self.cache.writer is not None:
+            self.cache.writer(key, item)
+        self.put(key, item, ttl)
+
+    def snapshot(self, path):
+        """
+        Write the entries to the file `path`, see BaseCaching.snapshot.
+        """
+        with self.lock:
+            self.cache.snapshot(path)
+
+    def restore(self, path):
+        """
+        Load the entries of a snapshot, see BaseCaching.restore.
+        """
+        with self.lock:
+            return self.cache.restore(path)
+
+    def expire(self, limit=None):
+        """
+        Drop the expired entries, at most `limit` of them.
+        """
+        with self.lock:
+            return self.cache.expire(limit)
+
+    def enable_stats(self, timed=False):
+        """
+        Start collecting statistics, see BaseCaching.enable_stats.
+        """
+        with self.lock:
+            self.cache.enable_stats(timed)
+
+    def statistics(self):
+        """
+        Return the statistics of the cache, or None when disabled.
+        """
+        with self.lock:
+            return self.cache.statistics()
+
+
+class StripedCache():
+    """
+    StripedCache splits the keys, by hash, over `stripes` caches of the
+    given policy, each one guarded by its own lock. Threads working on
+    keys of different stripes don't wait for each other.
+
+    The capacity (and byte budget) is split between the stripes, which
+    add up to exactly max_items (and max_bytes). The eviction policy
+    applies within each stripe, not globally.
+    """
+    STRIPES = 16
+
+    def __init__(self, policy, max_items=None, stripes=None, **options):
+        if stripes is None:
+            stripes = self.STRIPES
+        if max_items is None:
+            max_items = policy.MAX_ITEMS
+        max_bytes = options.pop("max_bytes", None)
+        # Chaque bande doit pouvoir contenir au moins un élément
+        stripes = max(1, min(stripes, max_items, max_bytes or stripes))
+        items = self._split(max_items, stripes)
+        budgets = self._split(max_bytes, stripes) if max_bytes else \
+            [None] * stripes
+        self.stripes = [
+            SynchronizedCache(policy(count, max_bytes=budget, **options))
+            for count, budget in zip(items, budgets)]
+
+    @staticmethod
+    def _split(total, parts):
+        """
+        Return `parts` shares of `total` that differ by one at most
+        and add up to `total`.
+        """
+        share, extra = divmod(total, parts)
+        return [share + (part < extra) for part in range(parts)]
+
+    def stripe(self, key):
+        """
+        Return the stripe holding `key`.
+        """
+        return self.stripes[hash(key) % len(self.stripes)]
+
+    @property
+    def cache_data(self):
+        """
+        Return a copy of the items cached in all the stripes.
+        """
+        data = {}
+        for stripe in self.stripes:
+            data.update(stripe.cache_data)
+        return data
+
+    def print_cache(self):
+        """
+        Print the cache.
+        """
+        self.expire()
+        print("Current cache:")
+        data = self.cache_data
+        for key in sorted(data.keys()):
+            print("{}: {}".format(key, data.get(key)))
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item to the cache, for `ttl` seconds if given.
+        """
+        if key is None or item is None:
+            return
+        self.stripe(key).put(key, item, ttl)
+
+    def get(self, key):
+        """
+        Retrieve an item from the cache by key.
+        """
+        if key is None:
+            return None
+        return self.stripe(key).get(key)
+
+    def delete(self, key):
+        """
+        Remove `key` from the cache.
+        """
+        if key is None:
+            return False
+        return self.stripe(key).delete(key)
+
+    def get_many(self, keys):
+        """
+        Retrieve the items of `keys`, in order, locking each stripe
+        once for all its keys.
+        """
+        keys = list(keys)
+        items = [None] * len(keys)
+        for stripe, positions in self._group(keys).items():
+            found = stripe.get_many([keys[i] for i in positions])
+            for position, item in zip(positions, found):
+                items[position] = item
+        return items
+
+    def put_many(self, items, ttl=None):
+        """
+        Add many items, locking each stripe once for all its keys.
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        items = [(key, item) for key, item in items
+                 if key is not None and item is not None]
+        groups = self._group([key for key, _ in items])
+        for stripe, positions in groups.items():
+            stripe.put_many([items[i] for i in positions], ttl)
+
+    def get_or_load(self, key, loader, ttl=None, with_ttl=False):
+        """
+        Get an item by key, calling loader(key) on a miss.
+        """
+        if key is None:
+            return None
+        return self.stripe(key).get_or_load(key, loader, ttl, with_ttl)
+
+    def write(self, key, item, ttl=None):
+        """
+        Write an item to the backing store, then cache it.
+        """
+        if key is None or item is None:
+            return
+        self.stripe(key).write(key, item, ttl)
+
+    def _group(self, keys):
+        """
+        Map each stripe to the positions of its keys in `keys`.
+        """
+        groups = {}
+        for position, key in enumerate(keys):
+            if key is not None:
+                groups.setdefault(self.stripe(key), []).append(position)
+        return groups
+
+    def expire(self, limit=None):
+        """
+        Drop the expired entries, at most `limit` of them per stripe.
+        """
+        return sum(stripe.expire(limit) for stripe in self.stripes)
+
+    def enable_stats(self, timed=False):
+        """
+        Start collecting statistics in every stripe.
+        """
+        for stripe in self.stripes:
+            stripe.enable_stats(timed)
+
+    def statistics(self):
+        """
+        Return the statistics summed over the stripes, or None when
+        they are disabled.
+        """
+        parts = [stripe.statistics() for stripe in self.stripes]
+        if parts[0] is None:
+            return None
+        result = {name: sum(part[name] for part in parts)
+                  for name in ("hits", "misses", "inserts", "evictions",
+                               "expirations", "size", "bytes")}
+        lookups = result["hits"] + result["misses"]
+        result["hit_rate"] = result["hits"] / lookups if lookups else 0.0
+        for name in ("get_latency", "put_latency"):
+            if name in parts[0]:
+                histogram = LatencyHistogram()
+                for stripe in self.stripes:
+                    histogram.merge(getattr(stripe.cache.stats, name))
+                result[name] = {percent: histogram.percentile(percent)
+                                for percent in (50, 90, 99)}
+        return result